@@ -5,19 +5,132 @@ Parses email exports to extract content for humor corpus building.
 Optimized for fantasy sports league emails and group threads.
 """
 
-import email
-import mailbox
+import codecs
+import mmap
 import re
+import sys
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
-from email.header import decode_header
+from datetime import UTC, datetime
+from email import policy
+from email.errors import HeaderParseError
+from email.message import EmailMessage
+from email.parser import BytesParser
 from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterator
 import quopri
 
-
-@dataclass
+from .keywords import KeywordMatcher
+
+# Patterns used per line / per message are compiled once at import time
+# Classifies a stripped body line as a quote, signature delimiter or signature start
+_LINE_CLASS_RE = re.compile(
+    r'(?P<quote>>)'
+    r'|(?P<delim>(?:--|---|____|— )$)'
+    r'|(?P<sig>Sent from|Get Outlook|Sent via)',
+    re.I,
+)
+_LINE_CLASS_FIRST_CHARS = frozenset('>-_—sSgG')
+_EMAIL_ADDR_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+_BLANK_RUN_RE = re.compile(r'\n\s*\n\s*\n')
+_SPACES_RE = re.compile(r' {2,}')
+_REPLY_PREFIX_RE = re.compile(r'^(re|fwd|fw):\s*', re.I)
+# Attribution lines must end in a colon so prose like "On second thought, he wrote: no"
+# is not mistaken for the start of a quoted reply. Gmail wraps long attributions inside
+# the address ("... Robert Smithson <\nrobert@yahoo.com> wrote:"), so allow one line break
+_REPLY_HEADER_RE = re.compile(
+    r'^(On [^\n]{0,120}(?:\n[^\n]{0,80})?wrote:[ \t\r]*$'
+    r'|-{3,}\s*Original Message\s*-{3,}'
+    r'|-{3,}\s*Forwarded message\s*-{3,}'
+    r'|Am [^\n]{0,80}schrieb[^\n]{0,120}(?:\n[^\n]{0,80})?:[ \t\r]*$'
+    r'|Le .{0,80}a écrit[ \t]*:[ \t\r]*$)',
+    re.I | re.M,
+)
+_MBOX_FROM_RE = re.compile(rb'^From ', re.M)
+
+# Raw header-block scanning for the metadata-only path (no email.message objects)
+_HEADER_END_RE = re.compile(rb'\r?\n\r?\n')
+_RAW_HEADER_RE = re.compile(
+    rb'^(From|To|Cc|Subject|Date|Message-ID|In-Reply-To|References|Thread-Index):'
+    rb'[ \t]*(.*(?:\r?\n[ \t].*)*)',
+    re.I | re.M,
+)
+_HEADER_FOLD_RE = re.compile(rb'\r?\n(?=[ \t])')
+_HEADER_FOLD_STR_RE = re.compile(r'\r?\n(?=[ \t])')
+_RAW_HEADER_NAMES = {
+    b'from': 'From',
+    b'to': 'To',
+    b'cc': 'Cc',
+    b'subject': 'Subject',
+    b'date': 'Date',
+    b'message-id': 'Message-ID',
+    b'in-reply-to': 'In-Reply-To',
+    b'references': 'References',
+    b'thread-index': 'Thread-Index',
+}
+_HEADER_NAMES = {name.lower(): name for name in _RAW_HEADER_NAMES.values()}
+
+# Raised by policy.default's structured parsers on malformed MIME headers
+_MALFORMED_MESSAGE_ERRORS = (HeaderParseError, IndexError, RecursionError)
+
+# Header values longer than this are truncated before regex matching
+_MAX_HEADER_LENGTH = 4096
+
+# Transfer encodings that can carry a readable text body
+_TEXT_TRANSFER_ENCODINGS = frozenset({'7bit', '8bit', 'quoted-printable', 'base64'})
+
+# The modern policy avoids compat32's legacy header handling
+_BYTES_PARSER = BytesParser(policy=policy.default)
+
+
+def _parse_raw_message(raw: bytes) -> EmailMessage | None:
+    """Parse message bytes, or return None if a malformed header breaks the parser."""
+    try:
+        return _BYTES_PARSER.parsebytes(raw)
+    except _MALFORMED_MESSAGE_ERRORS:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _codec(name: str) -> codecs.CodecInfo:
+    """Look up a codec by declared charset name, falling back to UTF-8."""
+    try:
+        info = codecs.lookup(name)
+    except LookupError:
+        return codecs.lookup('utf-8')
+    # Reject codecs named as a charset that don't decode bytes to str: hex, base64 and
+    # bz2 return bytes, while zlib, uu, rot13 and 'undefined' raise on the empty probe
+    try:
+        is_text = isinstance(info.decode(b'')[0], str)
+    except Exception:
+        is_text = False
+    return info if is_text else codecs.lookup('utf-8')
+
+
+@lru_cache(maxsize=1)
+def _load_talon():
+    """Import talon on first use; it pulls in scikit-learn and is slow to import."""
+    from talon import quotations
+    from talon.signature.bruteforce import extract_signature
+    return quotations, extract_signature
+
+
+@lru_cache(maxsize=4096)
+def _decode_header_cached(value: str) -> str:
+    """Decode a raw header value, memoized since thread replies repeat subjects."""
+    # The unstructured-header parser decodes encoded words and joins them with the
+    # surrounding text, leaving literal text (backslashes included) untouched
+    try:
+        return str(policy.default.header_factory('subject', value))
+    except HeaderParseError:
+        return value
+
+
+@dataclass(slots=True)
 class ParsedEmail:
     """Represents a single parsed email."""
     subject: str
@@ -62,143 +175,194 @@ class EmailParser:
         min_body_length: int = 20,
         strip_quotes: bool = True,
         strip_signatures: bool = True,
+        use_talon: bool = False,
     ):
         """
         Args:
             min_body_length: Skip emails with body shorter than this
-            strip_quotes: Remove quoted reply text (lines starting with >)
+            strip_quotes: Remove quoted reply text: lines starting with >, and
+                everything from the first reply attribution ("On ... wrote:"),
+                "Original Message" or "Forwarded message" line onward
             strip_signatures: Remove email signatures
+            use_talon: Detect replies/signatures with talon (pip install -e ".[quotes]");
+                more thorough than the built-in patterns but much slower
         """
         self.min_body_length = min_body_length
         self.strip_quotes = strip_quotes
         self.strip_signatures = strip_signatures
+        self.use_talon = use_talon
+        if use_talon:
+            # Fail at construction rather than on the first message
+            _load_talon()
 
     def _decode_header_value(self, value: str | None) -> str:
         """Decode encoded email header values."""
         if not value:
             return ""
+        return _decode_header_cached(value)
 
-        decoded_parts = []
-        for part, charset in decode_header(value):
-            if isinstance(part, bytes):
-                charset = charset or 'utf-8'
-                try:
-                    decoded_parts.append(part.decode(charset, errors='replace'))
-                except (LookupError, UnicodeDecodeError):
-                    decoded_parts.append(part.decode('utf-8', errors='replace'))
-            else:
-                decoded_parts.append(part)
-
-        return ' '.join(decoded_parts)
-
-    def _extract_body(self, msg: email.message.Message) -> str:
+    def _extract_body(self, msg: EmailMessage) -> str:
         """Extract plain text body from email message."""
         body_parts = []
 
         if msg.is_multipart():
+            # Join every inline text/plain part (e.g. Apple Mail's text, image, text layout)
             for part in msg.walk():
-                content_type = part.get_content_type()
                 content_disposition = str(part.get("Content-Disposition", ""))
 
                 # Skip attachments
                 if "attachment" in content_disposition:
                     continue
 
-                if content_type == "text/plain":
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        charset = part.get_content_charset() or 'utf-8'
-                        try:
-                            body_parts.append(payload.decode(charset, errors='replace'))
-                        except (LookupError, UnicodeDecodeError):
-                            body_parts.append(payload.decode('utf-8', errors='replace'))
+                if part.get_content_type() == "text/plain":
+                    body_parts.append(self._decode_part(part))
         else:
-            payload = msg.get_payload(decode=True)
-            if payload:
-                charset = msg.get_content_charset() or 'utf-8'
-                try:
-                    body_parts.append(payload.decode(charset, errors='replace'))
-                except (LookupError, UnicodeDecodeError):
-                    body_parts.append(payload.decode('utf-8', errors='replace'))
-
-        body = '\n'.join(body_parts)
+            body_parts.append(self._decode_part(msg))
+
+        body = '\n'.join(filter(None, body_parts))
         return self._clean_body(body)
 
+    def _decode_part(self, part: EmailMessage) -> str:
+        """Decode a single part's payload with its declared charset."""
+        encoding = str(part.get('Content-Transfer-Encoding', '7bit')).strip().lower()
+        # Skip parts with non-text transfer encodings (usually binary)
+        if encoding not in _TEXT_TRANSFER_ENCODINGS:
+            return ''
+
+        # The payload is already transfer-decoded, so the declared charset is trusted
+        payload = part.get_payload(decode=True)
+        if not payload:
+            return ''
+        charset = part.get_content_charset() or 'utf-8'
+        return _codec(charset).decode(payload, 'replace')[0]
+
+    def _strip_reply(self, body: str) -> str:
+        """Drop the quoted original message that follows a reply header."""
+        if self.use_talon:
+            return _load_talon()[0].extract_from_plain(body)
+
+        # One scan over the whole body; everything from the first reply header is quoted
+        match = _REPLY_HEADER_RE.search(body)
+        return body[:match.start()] if match else body
+
     def _clean_body(self, body: str) -> str:
         """Clean up email body text."""
+        if self.strip_quotes:
+            body = self._strip_reply(body)
+        if self.strip_signatures and self.use_talon:
+            body = _load_talon()[1](body)[0]
+
         lines = body.split('\n')
         cleaned_lines = []
 
         for line in lines:
-            # Strip quoted text
-            if self.strip_quotes and line.strip().startswith('>'):
-                continue
-
-            # Detect signature start
-            if self.strip_signatures:
-                if line.strip() in ('--', '— ', '---', '____'):
-                    break
-                if re.match(r'^(Sent from|Get Outlook|Sent via)', line.strip(), re.I):
-                    break
+            stripped = line.strip()
+
+            # One match spots quoted text and signature starts; the first-character
+            # check keeps ordinary lines away from the regex entirely
+            if stripped[:1] in _LINE_CLASS_FIRST_CHARS:
+                match = _LINE_CLASS_RE.match(stripped)
+                if match:
+                    if match.lastgroup == 'quote':
+                        if self.strip_quotes:
+                            continue
+                    elif self.strip_signatures:
+                        break
 
             cleaned_lines.append(line)
 
         text = '\n'.join(cleaned_lines)
 
         # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _BLANK_RUN_RE.sub('\n\n', text)
+        text = _SPACES_RE.sub(' ', text)
 
         return text.strip()
 
-    def _parse_recipients(self, msg: email.message.Message) -> list[str]:
+    def _raw_headers(self, msg: EmailMessage) -> dict[str, str]:
+        """
+        Collect the headers _parse_headers needs as raw, unfolded strings.
+
+        Reading raw_items() bypasses policy.default's structured header parsers,
+        which raise on malformed values such as "Message-ID: <".
+        """
+        headers = {}
+        for name, value in msg.raw_items():
+            canonical = _HEADER_NAMES.get(name.lower())
+            if canonical and canonical not in headers:
+                # Undo the parser's surrogateescape so 8-bit headers read as UTF-8
+                value = value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+                headers[canonical] = _HEADER_FOLD_STR_RE.sub('', value).strip()
+        return headers
+
+    def _parse_recipients(self, headers: dict[str, str]) -> list[str]:
         """Extract all recipients (To, Cc)."""
-        recipients = []
+        joined = '\n'.join(filter(None, (headers.get('To'), headers.get('Cc'))))
+        if not joined:
+            return []
 
-        for header in ('To', 'Cc'):
-            value = msg.get(header)
-            if value:
-                # Simple extraction - just get email addresses
-                addresses = re.findall(r'[\w\.-]+@[\w\.-]+', value)
-                recipients.extend(addresses)
+        # Simple extraction - just get email addresses, deduplicated in order
+        return list(dict.fromkeys(_EMAIL_ADDR_RE.findall(joined)))
+
+    def _parse_headers(self, msg: EmailMessage | dict[str, str]) -> dict:
+        """
+        Parse the header fields of a message without touching its body.
 
-        return list(set(recipients))
+        Also accepts a plain name -> value dict of raw (undecoded) headers,
+        as built by iter_mbox_metadata.
+        """
+        headers = msg if isinstance(msg, dict) else self._raw_headers(msg)
 
-    def _parse_message(self, msg: email.message.Message) -> ParsedEmail | None:
-        """Parse a single email.message.Message object."""
-        subject = self._decode_header_value(msg.get('Subject'))
-        sender = self._decode_header_value(msg.get('From'))
+        subject = self._decode_header_value(headers.get('Subject'))
+        sender = self._decode_header_value(headers.get('From'))
 
-        # Extract just email address from sender
-        sender_match = re.search(r'[\w\.-]+@[\w\.-]+', sender)
+        # Extract just email address from sender (bounded against header stuffing)
+        sender = sender[:_MAX_HEADER_LENGTH]
+        sender_match = _EMAIL_ADDR_RE.search(sender)
         sender_email = sender_match.group() if sender_match else sender
 
-        recipients = self._parse_recipients(msg)
+        recipients = self._parse_recipients(headers)
 
         # Parse date
         date = None
-        date_str = msg.get('Date')
+        date_str = headers.get('Date')
         if date_str:
             try:
                 date = parsedate_to_datetime(date_str)
             except (ValueError, TypeError):
                 pass
 
-        body = self._extract_body(msg)
+        # Thread-Index (Outlook) wins; otherwise the first References entry is the thread root
+        references = (headers.get('References') or '').split(None, 1)
+        thread_id = headers.get('Thread-Index') or (references[0] if references else None)
+
+        return {
+            "subject": subject,
+            "sender": sender_email,
+            "recipients": recipients,
+            "date": date,
+            "message_id": headers.get('Message-ID'),
+            "in_reply_to": headers.get('In-Reply-To'),
+            "thread_id": thread_id,
+        }
+
+    def _build_email(self, msg: EmailMessage, headers: dict) -> ParsedEmail | None:
+        """Decode the body and combine it with already-parsed headers."""
+        try:
+            body = self._extract_body(msg)
+        except _MALFORMED_MESSAGE_ERRORS:
+            # A MIME header (e.g. Content-Type) the structured parser rejects;
+            # skip this message rather than aborting the whole archive
+            return None
 
         if len(body) < self.min_body_length:
             return None
 
-        return ParsedEmail(
-            subject=subject,
-            sender=sender_email,
-            recipients=recipients,
-            date=date,
-            body=body,
-            message_id=msg.get('Message-ID'),
-            in_reply_to=msg.get('In-Reply-To'),
-            thread_id=msg.get('Thread-Index') or msg.get('References', '').split()[0] if msg.get('References') else None,
-        )
+        return ParsedEmail(body=body, **headers)
+
+    def _parse_message(self, msg: EmailMessage) -> ParsedEmail | None:
+        """Parse a single email.message.EmailMessage object."""
+        return self._build_email(msg, self._parse_headers(msg))
 
     def parse_eml(self, filepath: str | Path) -> ParsedEmail | None:
         """
@@ -212,8 +376,9 @@ class EmailParser:
         """
         filepath = Path(filepath)
 
-        with open(filepath, 'rb') as f:
-            msg = email.message_from_binary_file(f)
+        msg = _parse_raw_message(filepath.read_bytes())
+        if msg is None:
+            return None
 
         return self._parse_message(msg)
 
@@ -227,15 +392,60 @@ class EmailParser:
         Yields:
             ParsedEmail objects
         """
-        filepath = Path(filepath)
-
-        mbox = mailbox.mbox(str(filepath))
-
-        for msg in mbox:
+        for msg in self._iter_mbox_messages(Path(filepath)):
             parsed = self._parse_message(msg)
             if parsed:
                 yield parsed
 
+    def iter_mbox_headers(self, filepath: str | Path) -> Iterator[tuple[EmailMessage, dict]]:
+        """
+        Iterate an mbox file yielding parsed headers without decoding bodies.
+
+        Pair with extract_fantasy_threads_from_headers so that body decoding
+        and cleaning only runs for messages that pass the header filters.
+
+        Args:
+            filepath: Path to the .mbox file
+
+        Yields:
+            (message, headers) tuples, where headers holds every ParsedEmail
+            field except body
+        """
+        for msg in self._iter_mbox_messages(Path(filepath)):
+            yield msg, self._parse_headers(msg)
+
+    def iter_mbox_metadata(self, filepath: str | Path) -> Iterator[dict]:
+        """
+        Iterate an mbox file yielding header metadata only.
+
+        Much cheaper than parse_mbox or iter_mbox_headers for metadata-only
+        passes: each header block is scanned with one compiled pattern and
+        no email.message object is built.
+
+        Args:
+            filepath: Path to the .mbox file
+
+        Yields:
+            Dictionaries shaped like ParsedEmail.to_dict() without body
+            (date as an ISO string)
+        """
+        for raw in iter_mbox_bytes(filepath):
+            headers = {
+                _RAW_HEADER_NAMES[name]: value.decode('utf-8', errors='replace')
+                for name, value in parse_raw_headers(raw).items()
+            }
+            metadata = self._parse_headers(headers)
+            date = metadata["date"]
+            metadata["date"] = date.isoformat() if date else None
+            yield metadata
+
+    def _iter_mbox_messages(self, filepath: Path) -> Iterator[EmailMessage]:
+        """Yield each message of an mbox file."""
+        for raw in iter_mbox_bytes(filepath):
+            msg = _parse_raw_message(raw)
+            if msg is not None:
+                yield msg
+
     def parse_directory(self, dirpath: str | Path, pattern: str = "*.eml") -> Iterator[ParsedEmail]:
         """
         Parse all email files in a directory.
@@ -257,6 +467,166 @@ class EmailParser:
                 if parsed:
                     yield parsed
 
+    def parse_directory_parallel(
+        self,
+        dirpath: str | Path,
+        pattern: str = "*.eml",
+        workers: int | None = None,
+    ) -> Iterator[ParsedEmail]:
+        """
+        Parse all email files in a directory using a process pool.
+
+        Files are independent, so results are yielded as each file finishes
+        rather than in directory order.
+
+        Args:
+            dirpath: Path to directory
+            pattern: Glob pattern for files (default: *.eml)
+            workers: Number of worker processes (default: CPU count)
+
+        Yields:
+            ParsedEmail objects
+        """
+        dirpath = Path(dirpath)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_parse_email_file, self, email_file)
+                for email_file in dirpath.glob(pattern)
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def parse_mbox_parallel(
+        self,
+        filepath: str | Path,
+        workers: int | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[ParsedEmail]:
+        """
+        Parse an mbox file using a process pool.
+
+        The file is scanned once for "From " separators and split into byte
+        ranges of ``batch_size`` messages, which workers read and parse
+        independently. Emails are yielded in completion order.
+
+        Args:
+            filepath: Path to the .mbox file
+            workers: Number of worker processes (default: CPU count)
+            batch_size: Messages per worker task
+
+        Yields:
+            ParsedEmail objects
+        """
+        filepath = Path(filepath)
+        offsets = _mbox_offsets(filepath)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _parse_mbox_range,
+                    self,
+                    filepath,
+                    offsets[i],
+                    offsets[min(i + batch_size, len(offsets) - 1)],
+                )
+                for i in range(0, len(offsets) - 1, batch_size)
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+
+def iter_mbox_bytes(filepath: str | Path) -> Iterator[bytes]:
+    """
+    Yield the raw bytes of each message in an mbox file.
+
+    Args:
+        filepath: Path to the .mbox file
+
+    Yields:
+        Message bytes, each starting with its "From " separator line
+    """
+    with _map_mbox(filepath) as data:
+        yield from _split_mbox(data)
+
+
+def parse_raw_headers(raw: bytes) -> dict[bytes, bytes]:
+    """
+    Extract the threading/metadata headers from raw message bytes.
+
+    Only From, To, Cc, Subject, Date, Message-ID, In-Reply-To, References
+    and Thread-Index are read. Values are unfolded but not RFC 2047 decoded.
+
+    Args:
+        raw: Message bytes (an optional mbox "From " line is ignored)
+
+    Returns:
+        Dictionary mapping lowercased header name to value; the first
+        occurrence of a repeated header wins
+    """
+    end = _HEADER_END_RE.search(raw)
+    block = raw[:end.start()] if end else raw
+
+    headers = {}
+    for name, value in _RAW_HEADER_RE.findall(block):
+        headers.setdefault(name.lower(), _HEADER_FOLD_RE.sub(b'', value).strip())
+    return headers
+
+
+@contextmanager
+def _map_mbox(filepath: str | Path) -> Iterator[bytes | mmap.mmap]:
+    """Map an mbox file read-only (empty files, which mmap rejects, give b'')."""
+    with open(filepath, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            yield b''
+            return
+        # The kernel pages content in on demand instead of mailbox building a message index
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _message_starts(data: bytes | mmap.mmap) -> list[int]:
+    """Byte offsets of every "From " separator line in raw mbox bytes."""
+    return [m.start() for m in _MBOX_FROM_RE.finditer(data)]
+
+
+def _split_mbox(data: bytes | mmap.mmap) -> Iterator[bytes]:
+    """Split raw mbox bytes into one chunk per message, keeping the From line."""
+    starts = _message_starts(data)
+    for start, end in zip(starts, starts[1:] + [len(data)]):
+        yield data[start:end]
+
+
+def _mbox_offsets(filepath: Path) -> list[int]:
+    """Byte offsets of every message start in an mbox, plus the file size."""
+    with _map_mbox(filepath) as data:
+        return _message_starts(data) + [len(data)]
+
+
+def _parse_mbox_range(
+    parser: EmailParser, filepath: Path, start: int, end: int,
+) -> list[ParsedEmail]:
+    """Worker: parse the messages in one byte range of an mbox file."""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    results = []
+    for raw in _split_mbox(data):
+        msg = _parse_raw_message(raw)
+        parsed = parser._parse_message(msg) if msg is not None else None
+        if parsed:
+            results.append(parsed)
+    return results
+
+
+def _parse_email_file(parser: EmailParser, email_file: Path) -> list[ParsedEmail]:
+    """Worker: parse one .eml or .mbox file."""
+    if email_file.suffix.lower() == '.mbox':
+        return list(parser.parse_mbox(email_file))
+    parsed = parser.parse_eml(email_file)
+    return [parsed] if parsed else []
+
 
 def extract_fantasy_threads(
     emails: Iterator[ParsedEmail],
@@ -274,24 +644,71 @@ def extract_fantasy_threads(
     Yields:
         Filtered email dictionaries
     """
-    keywords_lower = [k.lower() for k in (subject_keywords or [
+    accepts = _fantasy_filter(league_domains, subject_keywords)
+
+    for email_obj in emails:
+        if accepts(email_obj.sender, email_obj.subject):
+            yield email_obj.to_dict()
+
+
+def extract_fantasy_threads_from_headers(
+    parser: EmailParser,
+    messages: Iterator[tuple[EmailMessage, dict]],
+    league_domains: list[str] | None = None,
+    subject_keywords: list[str] | None = None,
+) -> Iterator[dict]:
+    """
+    Filter messages for fantasy league content before decoding their bodies.
+
+    Same filters as extract_fantasy_threads, but applied to the headers from
+    EmailParser.iter_mbox_headers; only accepted messages have their body
+    extracted.
+
+    Args:
+        parser: EmailParser used to extract bodies of accepted messages
+        messages: Iterator of (message, headers) tuples
+        league_domains: Email domains to include (e.g., ['yahoo.com', 'espn.com'])
+        subject_keywords: Keywords to match in subject lines
+
+    Yields:
+        Filtered email dictionaries
+    """
+    accepts = _fantasy_filter(league_domains, subject_keywords)
+
+    for msg, headers in messages:
+        if not accepts(headers['sender'], headers['subject']):
+            continue
+
+        parsed = parser._build_email(msg, headers)
+        if parsed:
+            yield parsed.to_dict()
+
+
+def _fantasy_filter(
+    league_domains: list[str] | None,
+    subject_keywords: list[str] | None,
+) -> Callable[[str, str], bool]:
+    """Build the (sender, subject) predicate shared by the fantasy thread filters."""
+    keyword_matcher = KeywordMatcher(subject_keywords or [
         'fantasy', 'trade', 'waiver', 'lineup', 'matchup',
         'standings', 'draft', 'keeper', 'roster', 'playoffs'
-    ])]
+    ])
 
-    for email_obj in emails:
+    def accepts(sender: str, subject: str) -> bool:
         # Domain filter
         if league_domains:
-            sender_domain = email_obj.sender.split('@')[-1] if '@' in email_obj.sender else ''
+            sender_domain = sender.split('@')[-1] if '@' in sender else ''
             if sender_domain not in league_domains:
-                continue
+                return False
 
         # Subject keyword filter (looser matching for league emails)
-        subject_lower = email_obj.subject.lower()
-        if subject_keywords and not any(k in subject_lower for k in keywords_lower):
-            continue
+        subject_lower = subject.lower()
+        if subject_keywords and not keyword_matcher.search(subject_lower):
+            return False
+
+        return True
 
-        yield email_obj.to_dict()
+    return accepts
 
 
 def group_by_thread(emails: list[dict]) -> dict[str, list[dict]]:
@@ -307,36 +724,60 @@ def group_by_thread(emails: list[dict]) -> dict[str, list[dict]]:
     threads = {}
 
     for email_obj in emails:
-        # Use subject line as fallback thread ID
-        thread_id = email_obj.get('thread_id') or email_obj.get('subject', 'unknown')
+        thread_id = email_obj.get('thread_id')
 
-        # Normalize subject-based thread IDs (strip Re:, Fwd:, etc.)
-        if not email_obj.get('thread_id'):
-            thread_id = re.sub(r'^(re|fwd|fw):\s*', '', thread_id, flags=re.I)
+        # Use subject line as fallback thread ID, normalized (strip Re:, Fwd:, etc.)
+        if not thread_id:
+            thread_id = _REPLY_PREFIX_RE.sub('', email_obj.get('subject', 'unknown'))
 
-        if thread_id not in threads:
-            threads[thread_id] = []
+        # Intern so every email in a thread shares one key string
+        thread_id = sys.intern(thread_id)
 
-        threads[thread_id].append(email_obj)
+        threads.setdefault(thread_id, []).append(email_obj)
 
     # Sort each thread by date
-    for thread_id in threads:
-        threads[thread_id].sort(
-            key=lambda x: x.get('date') or '0000-00-00'
-        )
+    for thread in threads.values():
+        thread.sort(key=_date_sort_key)
 
     return threads
 
 
+def _date_sort_key(email_obj: dict) -> float:
+    """Epoch seconds of an email dict's date (ISO string or datetime); undated emails sort first."""
+    date = email_obj.get('date')
+    if not date:
+        return float('-inf')
+
+    if not isinstance(date, datetime):
+        try:
+            date = datetime.fromisoformat(date)
+        except (ValueError, TypeError):
+            return float('-inf')
+
+    # Dates without an offset (RFC 2822 "-0000") are taken as UTC
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+    return date.timestamp()
+
+
 if __name__ == "__main__":
     import argparse
     import json
 
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
     parser = argparse.ArgumentParser(description="Parse email files (.mbox, .eml)")
     parser.add_argument("input", help="Input file or directory")
     parser.add_argument("-o", "--output", help="Output JSON file", default="emails.json")
     parser.add_argument("--min-length", type=int, default=20, help="Minimum body length")
-    parser.add_argument("--no-strip-quotes", action="store_true", help="Keep quoted text")
+    parser.add_argument(
+        "--no-strip-quotes", action="store_true",
+        help="Keep quoted text (by default bodies are cut at the first reply/forward header)",
+    )
+    parser.add_argument("--use-talon", action="store_true", help="Use talon for replies/signatures")
     parser.add_argument("--domains", nargs="+", help="Filter by sender domains")
     parser.add_argument("--keywords", nargs="+", help="Filter by subject keywords")
     parser.add_argument("--group-threads", action="store_true", help="Group by conversation thread")
@@ -346,26 +787,38 @@ if __name__ == "__main__":
     email_parser = EmailParser(
         min_body_length=args.min_length,
         strip_quotes=not args.no_strip_quotes,
+        use_talon=args.use_talon,
     )
 
     input_path = Path(args.input)
 
-    if input_path.is_dir():
-        emails = email_parser.parse_directory(input_path)
-    elif input_path.suffix.lower() == '.mbox':
-        emails = email_parser.parse_mbox(input_path)
+    if input_path.suffix.lower() == '.mbox' and not input_path.is_dir():
+        # Filter on headers first so rejected messages never have their body decoded
+        messages = email_parser.iter_mbox_headers(input_path)
+        filtered = list(extract_fantasy_threads_from_headers(
+            email_parser, messages, args.domains, args.keywords,
+        ))
     else:
-        result = email_parser.parse_eml(input_path)
-        emails = [result] if result else []
+        if input_path.is_dir():
+            emails = email_parser.parse_directory(input_path)
+        else:
+            result = email_parser.parse_eml(input_path)
+            emails = [result] if result else []
 
-    filtered = list(extract_fantasy_threads(emails, args.domains, args.keywords))
+        filtered = list(extract_fantasy_threads(emails, args.domains, args.keywords))
 
     if args.group_threads:
         output_data = group_by_thread(filtered)
     else:
         output_data = filtered
 
-    with open(args.output, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    if orjson is not None:
+        with open(args.output, 'wb') as f:
+            f.write(orjson.dumps(
+                output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str,
+            ))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(output_data, f, indent=2)
 
     print(f"Extracted {len(filtered)} emails to {args.output}")
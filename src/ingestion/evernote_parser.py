@@ -5,7 +5,10 @@ Parses Evernote export files and extracts text content for humor corpus building
 ENEX files are XML-based with HTML content inside CDATA sections.
 """
 
+import io
+import mmap
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from html.parser import HTMLParser
@@ -13,21 +16,79 @@ from pathlib import Path
 from typing import Iterator
 import re
 
+from .keywords import KeywordMatcher
+
+# Optional C-accelerated HTML backends; HTMLTextExtractor is the pure-Python fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_html = lxml_etree = None
+
+# Whitespace / tag patterns are compiled once and reused for every note
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_SPACES_RE = re.compile(r' {2,}')
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Tags whose content is dropped, and block tags that start a new line
+_SKIP_TAGS = frozenset({'style', 'script', 'head', 'meta'})
+_NEWLINE_TAGS = frozenset({'p', 'div', 'br', 'li', 'tr'})
+_NEWLINE_SELECTOR = ', '.join(sorted(_NEWLINE_TAGS))
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse blank lines and runs of spaces in extracted text."""
+    text = _BLANK_LINES_RE.sub('\n\n', text)
+    text = _SPACES_RE.sub(' ', text)
+    return text.strip()
+
+
+def _text_via_selectolax(html_content: str) -> str:
+    """Extract text with selectolax's lexbor backend."""
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(list(_SKIP_TAGS))
+    for node in tree.css(_NEWLINE_SELECTOR):
+        node.insert_before('\n')
+    root = tree.root
+    if root is None:
+        return ''
+    return _normalize_text(root.text(deep=True, separator='', strip=False))
+
+
+def _text_via_lxml(html_content: str) -> str:
+    """Extract text with lxml.html."""
+    # ENML carries an XML declaration, so feed lxml bytes with an explicit encoding
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    root = lxml_html.document_fromstring(html_content.encode('utf-8'), parser=parser)
+    lxml_etree.strip_elements(root, *_SKIP_TAGS, with_tail=False)
+    for elem in root.iter(*_NEWLINE_TAGS):
+        elem.text = '\n' + (elem.text or '')
+    return _normalize_text(root.text_content())
+
 
 class HTMLTextExtractor(HTMLParser):
     """Extract plain text from HTML content."""
 
+    _skip_tags = _SKIP_TAGS
+    _newline_tags = _NEWLINE_TAGS
+
     def __init__(self):
         super().__init__()
-        self.text_parts = []
+        # Written incrementally so get_text() needn't join a list of every chunk
+        self._buffer = io.StringIO()
         self._skip_data = False
-        self._skip_tags = {'style', 'script', 'head', 'meta'}
 
     def handle_starttag(self, tag, attrs):
         if tag in self._skip_tags:
             self._skip_data = True
-        elif tag in ('p', 'div', 'br', 'li', 'tr'):
-            self.text_parts.append('\n')
+        elif tag in self._newline_tags:
+            self._buffer.write('\n')
 
     def handle_endtag(self, tag):
         if tag in self._skip_tags:
@@ -35,17 +96,13 @@ class HTMLTextExtractor(HTMLParser):
 
     def handle_data(self, data):
         if not self._skip_data:
-            self.text_parts.append(data)
+            self._buffer.write(data)
 
     def get_text(self) -> str:
-        text = ''.join(self.text_parts)
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        return text.strip()
+        return _normalize_text(self._buffer.getvalue())
 
 
-@dataclass
+@dataclass(slots=True)
 class EvernoteNote:
     """Represents a single Evernote note."""
     title: str
@@ -94,14 +151,18 @@ class EvernoteParser:
 
     def _extract_text_from_html(self, html_content: str) -> str:
         """Extract plain text from Evernote's HTML content."""
-        extractor = HTMLTextExtractor()
         try:
+            if LexborHTMLParser is not None:
+                return _text_via_selectolax(html_content)
+            if lxml_html is not None:
+                return _text_via_lxml(html_content)
+            extractor = HTMLTextExtractor()
             extractor.feed(html_content)
             return extractor.get_text()
         except Exception:
             # Fallback: strip tags with regex
-            text = re.sub(r'<[^>]+>', ' ', html_content)
-            return re.sub(r'\s+', ' ', text).strip()
+            text = _TAG_RE.sub(' ', html_content)
+            return _WHITESPACE_RE.sub(' ', text).strip()
 
     def _parse_note_element(self, note_elem: ET.Element) -> EvernoteNote | None:
         """Parse a single <note> element."""
@@ -133,6 +194,37 @@ class EvernoteParser:
             source_url=source_url,
         )
 
+    def _iter_note_elements(self, filepath: Path) -> Iterator[ET.Element]:
+        """Yield each <note> element from a memory-mapped .enex file."""
+        with open(filepath, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return
+            # Map the export read-only. iterparse still copies each read() chunk into
+            # bytes, so this saves buffered-file reads and syscalls, not copies
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from self._iterparse_notes(mm)
+
+    def _iterparse_notes(self, source: mmap.mmap) -> Iterator[ET.Element]:
+        """Yield each <note> element, clearing it once the caller is done with it."""
+        if lxml_etree is None:
+            for event, elem in ET.iterparse(source, events=('end',)):
+                if elem.tag == 'note':
+                    yield elem
+                    # Clear element to save memory
+                    elem.clear()
+            return
+
+        # lxml only fires on </note> and recovers from malformed export XML
+        context = lxml_etree.iterparse(
+            source, events=('end',), tag='note', huge_tree=True, recover=True,
+        )
+        for event, elem in context:
+            yield elem
+            # Clear element and drop processed siblings to bound memory
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
     def parse_file(self, filepath: str | Path) -> Iterator[EvernoteNote]:
         """
         Parse an .enex file and yield notes.
@@ -148,15 +240,10 @@ class EvernoteParser:
             raise FileNotFoundError(f"ENEX file not found: {filepath}")
 
         # Parse iteratively to handle large files
-        context = ET.iterparse(str(filepath), events=('end',))
-
-        for event, elem in context:
-            if elem.tag == 'note':
-                note = self._parse_note_element(elem)
-                if note:
-                    yield note
-                # Clear element to save memory
-                elem.clear()
+        for elem in self._iter_note_elements(filepath):
+            note = self._parse_note_element(elem)
+            if note:
+                yield note
 
     def parse_directory(self, dirpath: str | Path) -> Iterator[EvernoteNote]:
         """
@@ -172,6 +259,35 @@ class EvernoteParser:
         for enex_file in dirpath.glob("*.enex"):
             yield from self.parse_file(enex_file)
 
+    def parse_directory_parallel(
+        self, dirpath: str | Path, workers: int | None = None,
+    ) -> Iterator[EvernoteNote]:
+        """
+        Parse all .enex files in a directory using a process pool.
+
+        Notes are yielded per file as each file finishes, not in directory order.
+
+        Args:
+            dirpath: Path to directory containing .enex files
+            workers: Number of worker processes (default: CPU count)
+
+        Yields:
+            EvernoteNote objects from all files
+        """
+        dirpath = Path(dirpath)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_parse_enex_file, self, enex_file)
+                for enex_file in dirpath.glob("*.enex")
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+
+def _parse_enex_file(parser: EvernoteParser, enex_file: Path) -> list[EvernoteNote]:
+    """Worker: parse one .enex file into a list of notes."""
+    return list(parser.parse_file(enex_file))
+
 
 def extract_humor_snippets(
     notes: Iterator[EvernoteNote],
@@ -189,20 +305,20 @@ def extract_humor_snippets(
     Yields:
         Filtered note dictionaries
     """
-    keywords_lower = [k.lower() for k in (keyword_filter or [])]
-    tags_lower = [t.lower() for t in (tags_filter or [])]
+    keyword_matcher = KeywordMatcher(keyword_filter or [])
+    tags_lower = frozenset(t.lower() for t in (tags_filter or []))
 
     for note in notes:
         # Tag filter
         if tags_lower:
-            note_tags_lower = [t.lower() for t in note.tags]
-            if not any(t in note_tags_lower for t in tags_lower):
+            note_tags_lower = frozenset(t.lower() for t in note.tags)
+            if tags_lower.isdisjoint(note_tags_lower):
                 continue
 
         # Keyword filter
-        if keywords_lower:
+        if keyword_matcher.keywords:
             content_lower = note.content.lower()
-            if not any(k in content_lower for k in keywords_lower):
+            if not keyword_matcher.search(content_lower):
                 continue
 
         yield note.to_dict()
@@ -212,6 +328,11 @@ if __name__ == "__main__":
     import argparse
     import json
 
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
     parser = argparse.ArgumentParser(description="Parse Evernote .enex files")
     parser.add_argument("input", help="Input .enex file or directory")
     parser.add_argument("-o", "--output", help="Output JSON file", default="notes.json")
@@ -232,7 +353,11 @@ if __name__ == "__main__":
     filtered = extract_humor_snippets(notes, args.tags, args.keywords)
 
     results = list(filtered)
-    with open(args.output, 'w') as f:
-        json.dump(results, f, indent=2)
+    if orjson is not None:
+        with open(args.output, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2, default=str))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
 
     print(f"Extracted {len(results)} notes to {args.output}")
@@ -0,0 +1,53 @@
+"""
+Keyword matching for corpus filters
+
+Uses a pyahocorasick automaton when available so all keywords are matched
+in a single scan of the text, falling back to plain substring checks.
+"""
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Match any of a fixed set of keywords against lowercased text.
+
+    Usage:
+        matcher = KeywordMatcher(['trade', 'waiver'])
+        if matcher.search(subject.lower()):
+            ...
+    """
+
+    def __init__(self, keywords: list[str]):
+        """
+        Args:
+            keywords: Keywords to match (case-insensitive)
+        """
+        self.keywords = [k.lower() for k in keywords]
+        self._automaton = None
+        # An empty keyword is a substring of every text, as with `'' in text`
+        self._match_all = '' in self.keywords
+        words = [k for k in self.keywords if k]
+
+        if ahocorasick is not None and words and not self._match_all:
+            automaton = ahocorasick.Automaton()
+            for keyword in words:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in text (which should be lowercased)."""
+        if self._match_all:
+            return True
+
+        if self._automaton is not None:
+            # Stop at the first hit
+            for _ in self._automaton.iter(text):
+                return True
+            return False
+
+        return any(k in text for k in self.keywords)
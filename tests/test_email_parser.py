@@ -0,0 +1,248 @@
+"""Tests for the email parser."""
+
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from src.ingestion.email_parser import (
+    EmailParser,
+    extract_fantasy_threads_from_headers,
+    group_by_thread,
+)
+
+
+def _write_mbox(tmp_path, *messages: bytes):
+    """Write raw messages into an mbox file and return its path."""
+    path = tmp_path / "test.mbox"
+    path.write_bytes(b''.join(
+        b'From sender@example.com Mon Jan  1 00:00:00 2024\n' + msg.strip(b'\n') + b'\n\n'
+        for msg in messages
+    ))
+    return path
+
+
+def _message(headers: str, body: str = "This trade is an absolute joke, veto it.") -> bytes:
+    return (headers.strip('\n') + '\n\n' + body + '\n').encode('utf-8')
+
+
+def test_metadata_matches_header_parse_for_mixed_encoded_subject(tmp_path):
+    path = _write_mbox(
+        tmp_path,
+        _message(
+            "From: Bob <bob@yahoo.com>\n"
+            "To: a@x.com, b@y.com\n"
+            "Subject: Café trade =?utf-8?q?r=C3=A9sum=C3=A9?= €\n"
+            "Date: Mon, 1 Jan 2024 10:00:00 -0500\n"
+            "Message-ID: <m1@x.com>\n"
+            "References: <m0@x.com>"
+        ),
+        _message(
+            "From: =?utf-8?q?Dan_=C3=98?= <dan@gmail.com>\n"
+            "Subject: =?utf-8?b?RmFudGFzeSDimr4gZHJhZnQ=?=\n"
+            "Thread-Index: TI1"
+        ),
+        _message("From: bob@yahoo.com\nSubject: C:\\users\\bob =?utf-8?q?x?="),
+    )
+    parser = EmailParser()
+
+    from_headers = [headers for _, headers in parser.iter_mbox_headers(path)]
+    metadata = list(parser.iter_mbox_metadata(path))
+
+    assert [h["subject"] for h in metadata] == [
+        "Café trade résumé €", "Fantasy ⚾ draft", "C:\\users\\bob x",
+    ]
+    assert [h["subject"] for h in from_headers] == [h["subject"] for h in metadata]
+    assert [h["sender"] for h in from_headers] == [h["sender"] for h in metadata]
+    assert [h["thread_id"] for h in from_headers] == [h["thread_id"] for h in metadata]
+
+
+def test_metadata_is_shaped_like_to_dict(tmp_path):
+    path = _write_mbox(
+        tmp_path,
+        _message("From: bob@yahoo.com\nSubject: Trade\nDate: Mon, 1 Jan 2024 10:00:00 -0500"),
+        _message("From: bob@yahoo.com\nSubject: Re: Trade"),
+    )
+    parser = EmailParser()
+
+    metadata = list(parser.iter_mbox_metadata(path))
+    expected = {k: v for k, v in next(parser.parse_mbox(path)).to_dict().items() if k != "body"}
+
+    assert metadata[0] == expected
+    assert metadata[0]["date"] == "2024-01-01T10:00:00-05:00"
+    assert metadata[1]["date"] is None
+    json.dumps(metadata)
+    assert list(group_by_thread(metadata)) == ["Trade"]
+
+
+MALFORMED_HEADERS = [
+    "Message-ID: <",
+    "From: " + "(" * 2000,
+    "Content-Type: text/plain; charset=" + "(" * 2000,
+    "Content-Disposition: " + "(" * 2000,
+]
+
+
+def test_malformed_headers_do_not_abort_mbox(tmp_path):
+    good = _message("From: bob@yahoo.com\nSubject: Trade")
+    path = _write_mbox(
+        tmp_path,
+        good,
+        *(_message("Subject: Bad\n" + header) for header in MALFORMED_HEADERS),
+        good,
+    )
+    parser = EmailParser()
+
+    subjects = [email_obj.subject for email_obj in parser.parse_mbox(path)]
+    headers = [headers for _, headers in parser.iter_mbox_headers(path)]
+
+    # Malformed address / message-id headers are kept raw; unparseable MIME headers are skipped
+    assert subjects == ["Trade", "Bad", "Bad", "Bad", "Trade"]
+    assert headers[1]["message_id"] == "<"
+    assert len(headers) == 5
+
+
+def test_header_first_filter_survives_malformed_headers(tmp_path):
+    path = _write_mbox(
+        tmp_path,
+        *(_message("Subject: Trade " + header) for header in ["ok", *MALFORMED_HEADERS]),
+    )
+    path.write_bytes(path.read_bytes().replace(b"Subject: Trade ", b"Subject: Trade\n"))
+    parser = EmailParser()
+
+    filtered = list(extract_fantasy_threads_from_headers(
+        parser, parser.iter_mbox_headers(path), subject_keywords=["trade"],
+    ))
+
+    assert [email_obj["subject"] for email_obj in filtered] == ["Trade"] * 4
+
+
+def test_parse_eml_returns_none_for_unparseable_message(tmp_path):
+    path = tmp_path / "bad.eml"
+    path.write_bytes(_message("Subject: Bad\n" + MALFORMED_HEADERS[2]))
+
+    assert EmailParser().parse_eml(path) is None
+
+
+def test_all_inline_plain_parts_are_joined(tmp_path):
+    path = tmp_path / "mixed.eml"
+    path.write_bytes(_message(
+        'From: bob@yahoo.com\n'
+        'Subject: Draft recap\n'
+        'MIME-Version: 1.0\n'
+        'Content-Type: multipart/mixed; boundary="XX"',
+        '--XX\n'
+        'Content-Type: text/plain; charset=utf-8\n\n'
+        'First inline plain part about the draft.\n'
+        '--XX\n'
+        'Content-Type: image/png\n'
+        'Content-Disposition: inline; filename="pick.png"\n'
+        'Content-Transfer-Encoding: base64\n\n'
+        'iVBORw0KGgo=\n'
+        '--XX\n'
+        'Content-Type: text/plain; charset=utf-8\n\n'
+        'Second inline plain part after the image.\n'
+        '--XX\n'
+        'Content-Type: text/plain\n'
+        'Content-Disposition: attachment; filename="notes.txt"\n\n'
+        'Attached notes.\n'
+        '--XX--',
+    ))
+
+    body = EmailParser().parse_eml(path).body
+
+    assert "First inline plain part" in body
+    assert "Second inline plain part" in body
+    assert "Attached notes" not in body
+
+
+def test_single_part_html_body_is_kept(tmp_path):
+    path = tmp_path / "html.eml"
+    path.write_bytes(_message(
+        "From: bob@yahoo.com\nSubject: Standings\nContent-Type: text/html",
+        "<p>Standings are in and you are all losers.</p>",
+    ))
+
+    assert "Standings are in" in EmailParser().parse_eml(path).body
+
+
+def test_non_text_codec_charsets_fall_back_to_utf8(tmp_path):
+    path = _write_mbox(
+        tmp_path,
+        _message("Subject: Hex body\nContent-Type: text/plain; charset=hex"),
+        _message("Subject: =?base64?q?Trade_veto?=\nContent-Type: text/plain; charset=zlib"),
+        _message("Subject: Rot13 body\nContent-Type: text/plain; charset=rot13"),
+    )
+    parser = EmailParser()
+
+    emails = list(parser.parse_mbox(path))
+    metadata = list(parser.iter_mbox_metadata(path))
+
+    assert [email_obj.body for email_obj in emails] == [
+        "This trade is an absolute joke, veto it.",
+    ] * 3
+    assert metadata[1]["subject"] == "Trade veto"
+
+
+@pytest.mark.parametrize("attribution", [
+    "On Mon, Jan 1, 2024 at 10:00 AM Bob <bob@yahoo.com> wrote:",
+    "On Mon, Jan 1, 2024 at 10:00 AM Robert Smithson <\nrobert.smithson@yahoo.com> wrote:",
+    "Am 01.01.2024 um 10:00 schrieb Bob <bob@yahoo.com>:",
+    "Am Mo., 1. Jan. 2024 um 10:00 Uhr schrieb Robert Smithson <\nrobert.smithson@yahoo.com>:",
+    "Le 1 janv. 2024 à 10:00, Bob <bob@yahoo.com> a écrit :",
+])
+def test_reply_attribution_line_strips_quoted_text(attribution):
+    body = f"Absolutely not.\n\n{attribution}\nOriginal trade offer text."
+
+    assert EmailParser()._clean_body(body) == "Absolutely not."
+
+
+@pytest.mark.parametrize("body", [
+    "On second thought, here is what he wrote: nothing good.",
+    "Am Ende schrieb er: nichts Gutes.",
+    "Le commissaire a écrit : rien de bon.",
+])
+def test_inline_wrote_is_not_a_reply_header(body):
+    assert EmailParser()._clean_body(body) == body
+
+
+def test_group_by_thread_accepts_datetime_and_bad_dates():
+    emails = [
+        {"thread_id": "t", "subject": "late", "date": datetime(2024, 1, 2, tzinfo=UTC)},
+        {"thread_id": "t", "subject": "bad", "date": 12345},
+        {"thread_id": "t", "subject": "early", "date": "2024-01-01T12:00:00"},
+    ]
+
+    thread = group_by_thread(emails)["t"]
+
+    assert [email_obj["subject"] for email_obj in thread] == ["bad", "early", "late"]
+
+
+def _sorted_dicts(emails) -> list[str]:
+    return sorted(json.dumps(email_obj.to_dict(), sort_keys=True) for email_obj in emails)
+
+
+@pytest.mark.parametrize("count", [0, 1, 8])
+def test_parse_mbox_parallel_matches_parse_mbox(tmp_path, count):
+    path = _write_mbox(tmp_path, *(
+        _message(f"From: bob@yahoo.com\nSubject: Trade {i}", f"Veto trade number {i} " * (i % 3))
+        for i in range(count)
+    ))
+    # Non-default settings check that the parser is pickled to the workers intact
+    parser = EmailParser(min_body_length=15)
+
+    parallel = parser.parse_mbox_parallel(path, workers=2, batch_size=3)
+
+    assert _sorted_dicts(parallel) == _sorted_dicts(parser.parse_mbox(path))
+
+
+def test_parse_directory_parallel_matches_parse_directory(tmp_path):
+    for i in range(5):
+        (tmp_path / f"{i}.eml").write_bytes(_message(
+            f"From: bob@yahoo.com\nSubject: Trade {i}", f"Veto trade number {i} " * (i % 3),
+        ))
+    parser = EmailParser(min_body_length=15)
+
+    parallel = parser.parse_directory_parallel(tmp_path, workers=2)
+
+    assert _sorted_dicts(parallel) == _sorted_dicts(parser.parse_directory(tmp_path))
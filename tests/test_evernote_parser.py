@@ -0,0 +1,97 @@
+"""Tests for the Evernote parser."""
+
+import pytest
+
+from src.ingestion import evernote_parser
+from src.ingestion.evernote_parser import EvernoteParser, HTMLTextExtractor
+
+ENML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+    '<!DOCTYPE en-note SYSTEM "http://xml.evernote.com/pub/enml2.dtd">\n'
+    '<en-note><head><style>p { color: red; }</style></head>\n'
+    '<div>Commissioner notes<div>Trade <b>vetoed</b> &amp; appealed</div></div>\n'
+    '<div>Line one<br/>Line two</div>\n'
+    '<ul><li>Punt <i>kickers</i></li><li>Stream &quot;defenses&quot;</li></ul>\n'
+    '<div><br/></div>\n'
+    '<p>F&uuml;nf    spaces</p></en-note>'
+)
+
+ENML_TEXT = (
+    'Commissioner notes\nTrade vetoed & appealed\n\n'
+    'Line one\nLine two\n\n'
+    'Punt kickers\nStream "defenses"\n\n'
+    'Fünf spaces'
+)
+
+
+def _text_via_html_parser(html_content: str) -> str:
+    extractor = HTMLTextExtractor()
+    extractor.feed(html_content)
+    return extractor.get_text()
+
+
+@pytest.mark.parametrize("backend, module", [
+    (evernote_parser._text_via_selectolax, "LexborHTMLParser"),
+    (evernote_parser._text_via_lxml, "lxml_html"),
+    (_text_via_html_parser, None),
+])
+def test_html_backends_extract_identical_text(backend, module):
+    if module and getattr(evernote_parser, module) is None:
+        pytest.skip(f"{module} not installed")
+
+    assert backend(ENML) == ENML_TEXT
+
+
+ENEX = f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE en-export SYSTEM "http://xml.evernote.com/pub/evernote-export3.dtd">
+<en-export export-date="20240101T000000Z" application="Evernote">
+<note><title>Trade review</title><content><![CDATA[{ENML}]]></content>
+<created>20231215T143022Z</created><tag>fantasy</tag><tag>funny</tag></note>
+<note><title>Short</title><content><![CDATA[<en-note>Too short</en-note>]]></content></note>
+<note><title>Waivers</title><content><![CDATA[<en-note><div>Claimed the same \
+kicker three weeks running, a true waiver wire legend.</div></en-note>]]></content></note>
+</en-export>
+"""
+
+
+@pytest.fixture(params=["lxml", "elementtree"])
+def xml_backend(request, monkeypatch):
+    """Run each test with lxml's iterparse and with ElementTree's."""
+    if request.param == "elementtree":
+        monkeypatch.setattr(evernote_parser, "lxml_etree", None)
+    elif evernote_parser.lxml_etree is None:
+        pytest.skip("lxml not installed")
+
+
+def test_parse_file(tmp_path, xml_backend):
+    path = tmp_path / "notes.enex"
+    path.write_text(ENEX, encoding="utf-8")
+
+    notes = list(EvernoteParser(min_content_length=20).parse_file(path))
+
+    assert [note.title for note in notes] == ["Trade review", "Waivers"]
+    assert notes[0].content == ENML_TEXT
+    assert notes[0].tags == ["fantasy", "funny"]
+    assert notes[0].created.isoformat() == "2023-12-15T14:30:22"
+    assert notes[1].content.startswith("Claimed the same kicker")
+
+
+def test_parse_empty_file_yields_no_notes(tmp_path, xml_backend):
+    path = tmp_path / "empty.enex"
+    path.write_bytes(b"")
+
+    assert list(EvernoteParser().parse_file(path)) == []
+
+
+def test_parse_directory_parallel_matches_parse_directory(tmp_path):
+    for i in range(3):
+        (tmp_path / f"{i}.enex").write_text(ENEX.replace("Trade review", f"Trade {i}"))
+    (tmp_path / "empty.enex").write_bytes(b"")
+    parser = EvernoteParser(min_content_length=20)
+
+    parallel = parser.parse_directory_parallel(tmp_path, workers=2)
+
+    def key(note):
+        return note.title, note.content
+
+    assert sorted(parallel, key=key) == sorted(parser.parse_directory(tmp_path), key=key)
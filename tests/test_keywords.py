@@ -0,0 +1,36 @@
+"""Tests for keyword matching."""
+
+import pytest
+
+from src.ingestion import keywords
+from src.ingestion.keywords import KeywordMatcher
+
+
+@pytest.fixture(params=["automaton", "substring"])
+def backend(request, monkeypatch):
+    """Run each test with and without pyahocorasick."""
+    if request.param == "substring":
+        monkeypatch.setattr(keywords, "ahocorasick", None)
+    elif keywords.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
+
+
+def test_matches_any_keyword(backend):
+    matcher = KeywordMatcher(["Trade", "waiver"])
+
+    assert matcher.search("veto this trade")
+    assert matcher.search("waiver wire")
+    assert not matcher.search("draft day")
+
+
+@pytest.mark.parametrize("words", [[""], ["trade", ""]])
+def test_empty_keyword_matches_everything(backend, words):
+    matcher = KeywordMatcher(words)
+
+    assert matcher.keywords
+    assert matcher.search("draft day")
+    assert matcher.search("")
+
+
+def test_no_keywords_match_nothing(backend):
+    assert not KeywordMatcher([]).search("veto this trade")
@@ -0,0 +1,66 @@
+"""Tests for thread keying and ordering."""
+
+import pytest
+
+from src.ingestion.email_parser import EmailParser, group_by_thread
+
+
+def _thread_id(tmp_path, headers: str) -> str | None:
+    """Parse a one-message .eml file with the given headers and return its thread_id."""
+    path = tmp_path / "msg.eml"
+    path.write_bytes(
+        f"From: bob@yahoo.com\nSubject: Trade\n{headers}\n\n"
+        "This trade is an absolute joke, veto it.\n".encode()
+    )
+    return EmailParser().parse_eml(path).thread_id
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ("Thread-Index: AdoAbCdEf", "AdoAbCdEf"),
+    ("Thread-Index: AdoAbCdEf\nReferences: <a@x> <b@x>", "AdoAbCdEf"),
+    ("References: <a@x>\n <b@x>", "<a@x>"),
+    ("References:   ", None),
+    ("", None),
+])
+def test_thread_id_from_headers(tmp_path, headers, expected):
+    assert _thread_id(tmp_path, headers) == expected
+
+
+def test_subject_fallback_strips_reply_prefixes():
+    emails = [
+        {"thread_id": None, "subject": "Trade"},
+        {"thread_id": None, "subject": "Re: Trade"},
+        {"thread_id": None, "subject": "FWD: Trade"},
+        {},
+    ]
+
+    threads = group_by_thread(emails)
+
+    assert list(threads) == ["Trade", "unknown"]
+    assert len(threads["Trade"]) == 3
+
+
+def test_thread_sorted_by_instant_across_offsets():
+    emails = [
+        {"thread_id": "t", "subject": "a", "date": "2024-01-01T10:00:00-05:00"},
+        {"thread_id": "t", "subject": "b", "date": "2024-01-01T12:00:00+00:00"},
+        {"thread_id": "t", "subject": "c", "date": "2024-01-01T16:30:00+01:00"},
+        {"thread_id": "t", "subject": "d", "date": None},
+    ]
+
+    thread = group_by_thread(emails)["t"]
+
+    # 12:00Z < 15:00Z (10:00-05:00) < 15:30Z (16:30+01:00); undated first
+    assert [email_obj["subject"] for email_obj in thread] == ["d", "b", "a", "c"]
+
+
+@pytest.mark.parametrize("date", ["not a date", "", 0, ["2024-01-01"]])
+def test_unparseable_dates_sort_first(date):
+    emails = [
+        {"thread_id": "t", "subject": "dated", "date": "2024-01-01T00:00:00"},
+        {"thread_id": "t", "subject": "bad", "date": date},
+    ]
+
+    thread = group_by_thread(emails)["t"]
+
+    assert [email_obj["subject"] for email_obj in thread] == ["bad", "dated"]